@@ -3,15 +3,80 @@
 JavaScript 임베딩 서비스와 연동하여 벡터 검색 및 Ollama LLM 스트리밍 응답
 """
 import os
-import json
+import tempfile
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterator
 import httpx
+import orjson
 from fastapi import HTTPException
 from pydantic import BaseModel
 
+from semantic_cache import SemanticCache
+
 logger = logging.getLogger(__name__)
 
+# 요청마다 변하지 않는 프롬프트 앞/뒤 부분
+PROMPT_HEADER = """당신은 주어진 컨텍스트를 바탕으로 정확하고 도움이 되는 답변을 제공하는 한국어 어시스턴트입니다.
+
+컨텍스트:
+"""
+
+PROMPT_FOOTER = """
+
+지침:
+- 주어진 컨텍스트만을 사용하여 답변하세요
+- 컨텍스트에서 찾을 수 없는 정보는 "주어진 문서에서 해당 정보를 찾을 수 없습니다"라고 답하세요
+- 추측하거나 컨텍스트 외의 정보를 사용하지 마세요
+- 한국어로 자연스럽고 정확하게 답변하세요
+
+답변:"""
+
+
+def sse_event(payload: Dict[str, Any]) -> bytes:
+    """SSE data 이벤트 프레임 생성
+
+    EventSourceResponse는 bytes 항목을 추가 인코딩 없이 그대로 전송합니다.
+    """
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+def _parse_ndjson_lines(data: bytes) -> List[Dict[str, Any]]:
+    objects = []
+    for line in data.split(b"\n"):
+        if line:
+            try:
+                objects.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                continue
+    return objects
+
+
+async def aiter_ndjson(response: httpx.Response) -> AsyncIterator[List[Dict[str, Any]]]:
+    """NDJSON 스트림을 바이트 단위로 파싱
+
+    문자열 디코딩/줄 단위 분할 없이 네트워크 청크마다 완성된 줄들을 한 번에
+    파싱하여, 해당 청크에 들어 있던 객체 목록을 반환합니다.
+    """
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes():
+        buffer.extend(chunk)
+        end = buffer.rfind(b"\n")
+        if end == -1:
+            continue
+
+        objects = _parse_ndjson_lines(bytes(buffer[:end]))
+        del buffer[:end + 1]
+        if objects:
+            yield objects
+
+    # 마지막 줄에 줄바꿈이 없는 경우
+    if buffer:
+        objects = _parse_ndjson_lines(bytes(buffer))
+        if objects:
+            yield objects
+
 class QuestionRequest(BaseModel):
     question: str
     session_id: Optional[str] = None
@@ -25,46 +90,93 @@ class AskHandler:
         self.frontend_url = os.getenv('FRONTEND_URL', 'http://localhost:3001')
         self.ollama_url = os.getenv('OLLAMA_URL', 'http://127.0.0.1:11434')
         self.ollama_model = os.getenv('OLLAMA_MODEL', 'exaone3.5:7.8b')
+        self.cache = SemanticCache(
+            threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95')),
+            ttl_seconds=float(os.getenv('SEMANTIC_CACHE_TTL_SECONDS', '3600')),
+            max_entries=int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '512')),
+            # 같은 호스트의 모든 워커가 공유하는 무효화 스탬프 파일
+            stamp_path=os.getenv(
+                'SEMANTIC_CACHE_STAMP_FILE',
+                os.path.join(tempfile.gettempdir(), 'pdfreader-semantic-cache.stamp'),
+            ),
+        )
 
-    def build_prompt(self, question: str, contexts: List[str]) -> str:
-        """LLM 프롬프트 생성"""
-        context_block = '\n\n'.join([f"{i+1}. {context}" for i, context in enumerate(contexts)])
+        # 요청마다 연결을 새로 맺지 않도록 프론트엔드/Ollama 호출에 공유하는 클라이언트
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=128),
+        )
 
-        return f"""당신은 주어진 컨텍스트를 바탕으로 정확하고 도움이 되는 답변을 제공하는 한국어 어시스턴트입니다.
+        # Ollama 동시 생성 수 제한 (한도를 넘는 요청은 대기)
+        self.ollama_concurrency = max(1, int(os.getenv('OLLAMA_CONCURRENCY', '4')))
+        self._ollama_active = 0
+        # 모듈 임포트 시점이 아니라 서버 이벤트 루프 안에서 처음 사용할 때 생성
+        # (Python 3.9의 asyncio.Condition은 생성 시점의 루프에 묶임)
+        self._ollama_cond: Optional[asyncio.Condition] = None
 
-컨텍스트:
-{context_block}
+    async def aclose(self) -> None:
+        """공유 HTTP 클라이언트 종료"""
+        await self.client.aclose()
 
-질문: {question}
+    def build_prompt(self, question: str, contexts: List[str]) -> str:
+        """LLM 프롬프트 생성"""
+        parts = [PROMPT_HEADER]
+        for i, context in enumerate(contexts):
+            if i:
+                parts.append('\n\n')
+            parts.append(f"{i + 1}. ")
+            parts.append(context)
+        parts.append('\n\n질문: ')
+        parts.append(question)
+        parts.append(PROMPT_FOOTER)
+        return ''.join(parts)
 
-지침:
-- 주어진 컨텍스트만을 사용하여 답변하세요
-- 컨텍스트에서 찾을 수 없는 정보는 "주어진 문서에서 해당 정보를 찾을 수 없습니다"라고 답하세요
-- 추측하거나 컨텍스트 외의 정보를 사용하지 마세요
-- 한국어로 자연스럽고 정확하게 답변하세요
+    def _ollama_condition(self) -> asyncio.Condition:
+        """실행 중인 이벤트 루프에서 Ollama 동시성 조건 변수를 지연 생성"""
+        if self._ollama_cond is None:
+            self._ollama_cond = asyncio.Condition()
+        return self._ollama_cond
 
-답변:"""
+    @asynccontextmanager
+    async def ollama_slot(self):
+        """Ollama 생성 슬롯 획득 (한도 초과 시 빈 슬롯이 생길 때까지 대기)"""
+        cond = self._ollama_condition()
+        async with cond:
+            while self._ollama_active >= self.ollama_concurrency:
+                try:
+                    await cond.wait()
+                except asyncio.CancelledError:
+                    # 깨어난 직후 취소되면(클라이언트 연결 종료) 받은 notify가 사라지므로 다음 대기자에게 넘김
+                    cond.notify(1)
+                    raise
+            self._ollama_active += 1
+        try:
+            yield
+        finally:
+            async with cond:
+                self._ollama_active -= 1
+                cond.notify(1)
 
     async def search_vectors_via_frontend(self, question: str, top_k: int = 5) -> Dict[str, Any]:
         """프론트엔드의 JavaScript 임베딩 서비스를 통한 벡터 검색"""
         try:
             # 프론트엔드에 임베딩 및 검색 요청
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.frontend_url}/api/vector-search",
-                    json={
-                        "question": question,
-                        "top_k": top_k
-                    }
-                )
+            response = await self.client.post(
+                f"{self.frontend_url}/api/vector-search",
+                json={
+                    "question": question,
+                    "top_k": top_k
+                },
+                timeout=30.0
+            )
 
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"벡터 검색 실패: {response.status_code}"
-                    )
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"벡터 검색 실패: {response.status_code}"
+                )
 
-                return response.json()
+            return response.json()
 
         except Exception as e:
             logger.error(f"벡터 검색 실패: {str(e)}")
@@ -76,13 +188,31 @@ class AskHandler:
                 "metadatas": []
             }
 
-    async def stream_response(self, request: QuestionRequest):
-        """스트리밍 응답 생성"""
+    def replay_cached_response(self, entry: Dict[str, Any]) -> Iterator[bytes]:
+        """캐시된 소스 정보와 답변을 SSE 이벤트로 재생"""
+        if entry['sources']:
+            yield sse_event({'type': 'sources', 'sources': entry['sources']})
+        yield sse_event({'type': 'content', 'content': entry['answer']})
+        yield sse_event({'type': 'done', 'model': self.ollama_model, 'cached': True})
+
+    async def stream_response(self, request: QuestionRequest) -> AsyncIterator[bytes]:
+        """스트리밍 응답 생성
+
+        각 항목은 sse_event()로 완성된 SSE 프레임입니다. 응답이 동기 이터레이터를
+        스레드풀에서 소비하지 않도록 반드시 async 제너레이터로 유지합니다.
+        """
         try:
             logger.info(f"스트리밍 응답 시작: {request.question}")
 
-            # 먼저 소스 정보 전송 (임시)
-            yield f"data: {json.dumps({'type': 'sources', 'sources': []})}\n\n"
+            # 동일한 질문은 벡터 검색 없이 캐시에서 응답
+            cached = self.cache.lookup_question(request.question, request.top_k)
+            if cached:
+                for event in self.replay_cached_response(cached):
+                    yield event
+                return
+
+            # 검색 이후 문서가 추가되어 캐시가 무효화되면 이 응답은 저장하지 않음
+            cache_generation = self.cache.generation
 
             # 벡터 검색
             search_result = await self.search_vectors_via_frontend(
@@ -91,63 +221,86 @@ class AskHandler:
             )
 
             if not search_result.get('ok', False):
-                yield f"data: {json.dumps({'type': 'error', 'message': '벡터 검색 실패'})}\n\n"
+                yield sse_event({'type': 'error', 'message': '벡터 검색 실패'})
                 return
 
             contexts = search_result.get('contexts', [])
             metadatas = search_result.get('metadatas', [])
+            query_embedding = search_result.get('query_embedding')
+
+            # 유사한 질문은 LLM 호출 없이 캐시에서 응답
+            if query_embedding:
+                cached = self.cache.lookup(query_embedding, request.top_k)
+                if cached:
+                    for event in self.replay_cached_response(cached):
+                        yield event
+                    return
 
             # 소스 정보 업데이트
             if metadatas:
-                yield f"data: {json.dumps({'type': 'sources', 'sources': metadatas})}\n\n"
+                yield sse_event({'type': 'sources', 'sources': metadatas})
 
             if not contexts:
                 message = "죄송합니다. 업로드된 문서에서 관련된 정보를 찾을 수 없습니다."
-                yield f"data: {json.dumps({'type': 'content', 'content': message})}\n\n"
-                yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                yield sse_event({'type': 'content', 'content': message})
+                yield sse_event({'type': 'done'})
                 return
 
             # Ollama 스트리밍 호출
             prompt = self.build_prompt(request.question, contexts)
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                async with client.stream(
-                    "POST",
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": self.ollama_model,
-                        "prompt": prompt,
-                        "stream": True,
-                        "options": {
-                            "temperature": 0.1,
-                            "top_p": 0.9,
-                            "top_k": 40,
-                        }
-                    }
-                ) as response:
+            # 생성 중 토큰 간 간격이 길어져도 연결이 끊기지 않도록 읽기 타임아웃 없음
+            ollama_timeout = httpx.Timeout(60.0, connect=5.0, read=None)
 
-                    if response.status_code != 200:
-                        yield f"data: {json.dumps({'type': 'error', 'message': f'Ollama API 오류: {response.status_code}'})}\n\n"
-                        return
+            async with self.ollama_slot(), self.client.stream(
+                "POST",
+                f"{self.ollama_url}/api/generate",
+                headers={
+                    "Accept": "application/x-ndjson",
+                    "Connection": "keep-alive",
+                },
+                timeout=ollama_timeout,
+                json={
+                    "model": self.ollama_model,
+                    "prompt": prompt,
+                    "stream": True,
+                    "options": {
+                        "temperature": 0.1,
+                        "top_p": 0.9,
+                        "top_k": 40,
+                    }
+                }
+            ) as response:
 
-                    async for line in response.aiter_lines():
-                        if line.strip():
-                            try:
-                                data = json.loads(line)
+                if response.status_code != 200:
+                    yield sse_event({'type': 'error', 'message': f'Ollama API 오류: {response.status_code}'})
+                    return
 
-                                if data.get('response'):
-                                    yield f"data: {json.dumps({'type': 'content', 'content': data['response']})}\n\n"
+                answer_parts = []
 
-                                if data.get('done'):
-                                    yield f"data: {json.dumps({'type': 'done', 'model': self.ollama_model})}\n\n"
-                                    return
+                async for batch in aiter_ndjson(response):
+                    # 같은 네트워크 청크로 도착한 토큰은 하나의 이벤트로 전송
+                    content = ''.join(data['response'] for data in batch if data.get('response'))
+                    if content:
+                        answer_parts.append(content)
+                        yield sse_event({'type': 'content', 'content': content})
 
-                            except json.JSONDecodeError:
-                                continue
+                    if any(data.get('done') for data in batch):
+                        if query_embedding and answer_parts:
+                            self.cache.insert(
+                                request.question,
+                                query_embedding,
+                                metadatas,
+                                ''.join(answer_parts),
+                                top_k=request.top_k,
+                                generation=cache_generation,
+                            )
+                        yield sse_event({'type': 'done', 'model': self.ollama_model})
+                        return
 
         except Exception as e:
             logger.error(f"스트리밍 응답 실패: {str(e)}")
-            yield f"data: {json.dumps({'type': 'error', 'message': f'스트리밍 실패: {str(e)}'})}\n\n"
+            yield sse_event({'type': 'error', 'message': f'스트리밍 실패: {str(e)}'})
 
 # 글로벌 핸들러 인스턴스
 ask_handler = AskHandler()
\ No newline at end of file
@@ -2,14 +2,23 @@
 FastAPI 백엔드 서버 - PDF 처리 전용
 """
 import os
+import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+import tempfile
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, Tuple
 
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import uvicorn
+from sse_starlette.sse import EventSourceResponse
 from dotenv import load_dotenv
 
 from pdf_processor import process_pdf_file
@@ -25,11 +34,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# PDF 추출/청킹 워커 프로세스 수
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', str(max(1, (os.cpu_count() or 2) // 2))))
+
+def create_pdf_executor() -> ProcessPoolExecutor:
+    """PDF 처리용 워커 프로세스 풀 생성"""
+    # spawn: 이벤트 루프/HTTP 클라이언트 상태를 워커로 복제하지 않음
+    return ProcessPoolExecutor(
+        max_workers=PDF_WORKERS,
+        mp_context=multiprocessing.get_context('spawn')
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 시작/종료 시 공유 리소스 관리"""
+    app.state.pdf_executor = create_pdf_executor()
+    try:
+        yield
+    finally:
+        app.state.pdf_executor.shutdown(wait=False, cancel_futures=True)
+        await ask_handler.aclose()
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="PDF RAG Backend",
     description="PDF 처리 및 텍스트 추출을 위한 백엔드 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -59,6 +90,56 @@ class HealthResponse(BaseModel):
 # 환경 변수
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3001')
 MAX_FILE_SIZE = int(os.getenv('MAX_PDF_SIZE_MB', '50'))
+MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE * 1024 * 1024
+UPLOAD_READ_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+async def save_upload_to_tempfile(file: UploadFile) -> Tuple[str, int]:
+    """업로드 파일을 메모리에 모두 올리지 않고 임시 파일로 스트리밍 저장
+
+    Returns:
+        (임시 파일 경로, 파일 크기). 호출자가 파일을 삭제해야 합니다.
+    """
+    file_size = 0
+
+    tmp_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+    try:
+        with tmp_file:
+            while chunk := await file.read(UPLOAD_READ_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"파일이 너무 큽니다. 최대 {MAX_FILE_SIZE}MB까지 지원합니다"
+                    )
+                tmp_file.write(chunk)
+    except BaseException:
+        os.unlink(tmp_file.name)
+        raise
+
+    return tmp_file.name, file_size
+
+
+async def run_pdf_processing(pdf_path: str, filename: str, method: str) -> Dict[str, Any]:
+    """CPU 바운드인 PDF 처리를 워커 프로세스에서 실행 (이벤트 루프 차단 방지)
+
+    워커에는 파일 경로만 전달하므로 PDF 바이트를 직렬화하지 않습니다.
+    """
+    loop = asyncio.get_running_loop()
+    executor = app.state.pdf_executor
+    try:
+        return await loop.run_in_executor(
+            executor,
+            functools.partial(process_pdf_file, pdf_path=pdf_path, filename=filename, method=method)
+        )
+    except BrokenProcessPool as e:
+        # 워커가 비정상 종료(MuPDF 세그폴트, OOM 등)되면 풀은 이후 모든 작업을 거부하므로
+        # 새 풀로 교체하고 현재 요청만 실패 처리 (동시에 실패한 요청 중 첫 번째만 교체)
+        logger.error(f"PDF 워커 프로세스 비정상 종료, 워커 풀 재생성: {filename}")
+        if app.state.pdf_executor is executor:
+            app.state.pdf_executor = create_pdf_executor()
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise RuntimeError("PDF 처리 워커가 비정상 종료되었습니다. 다시 시도해주세요.") from e
 
 @app.get("/", response_model=HealthResponse)
 async def root():
@@ -95,8 +176,8 @@ async def ingest_pdf(
     Returns:
         추출된 텍스트와 메타데이터
     """
-    import time
-    start_time = time.time()
+    start_time = time.perf_counter()
+    pdf_path = None
 
     try:
         logger.info(f"📁 PDF 처리 요청: {file.filename} ({user_id})")
@@ -115,27 +196,27 @@ async def ingest_pdf(
             )
 
         # 파일 크기 확인
-        if file.size and file.size > MAX_FILE_SIZE * 1024 * 1024:
+        if file.size and file.size > MAX_FILE_SIZE_BYTES:
             raise HTTPException(
                 status_code=413,
                 detail=f"파일이 너무 큽니다. 최대 {MAX_FILE_SIZE}MB까지 지원합니다"
             )
 
-        # PDF 파일 읽기
-        pdf_bytes = await file.read()
+        # PDF 파일을 임시 파일로 스트리밍 저장
+        pdf_path, file_size = await save_upload_to_tempfile(file)
 
-        if not pdf_bytes:
+        if not file_size:
             raise HTTPException(
                 status_code=400,
                 detail="빈 파일입니다"
             )
 
-        logger.info(f"📄 파일 크기: {len(pdf_bytes) / 1024 / 1024:.2f}MB")
+        logger.info(f"📄 파일 크기: {file_size / 1024 / 1024:.2f}MB")
 
         # PDF 처리
         try:
-            result = process_pdf_file(
-                pdf_bytes=pdf_bytes,
+            result = await run_pdf_processing(
+                pdf_path=pdf_path,
                 filename=file.filename,
                 method=method
             )
@@ -152,7 +233,7 @@ async def ingest_pdf(
                 detail=f"PDF 처리 중 오류가 발생했습니다: {str(e)}"
             )
 
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
 
         logger.info(
             f"✅ PDF 처리 완료: {file.filename} "
@@ -166,7 +247,7 @@ async def ingest_pdf(
             "metadata": {
                 **result['metadata'],
                 'extraction_method': result['extraction_method'],
-                'file_size_mb': len(pdf_bytes) / 1024 / 1024,
+                'file_size_mb': file_size / 1024 / 1024,
                 'chunk_count': result['chunk_count'],
             },
             "processing_time": processing_time,
@@ -181,6 +262,9 @@ async def ingest_pdf(
             status_code=500,
             detail=f"서버 오류가 발생했습니다: {str(e)}"
         )
+    finally:
+        if pdf_path:
+            os.unlink(pdf_path)
 
 @app.post("/extract-text", response_model=ProcessResponse)
 async def extract_text_only(
@@ -190,8 +274,8 @@ async def extract_text_only(
     """
     PDF에서 텍스트만 추출 (임베딩/저장 없이)
     """
-    import time
-    start_time = time.time()
+    start_time = time.perf_counter()
+    pdf_path = None
 
     try:
         logger.info(f"📄 텍스트 추출 요청: {file.filename}")
@@ -203,17 +287,17 @@ async def extract_text_only(
                 detail="PDF 파일만 지원됩니다"
             )
 
-        # PDF 파일 읽기
-        pdf_bytes = await file.read()
+        # PDF 파일을 임시 파일로 스트리밍 저장
+        pdf_path, _ = await save_upload_to_tempfile(file)
 
         # PDF 처리
-        result = process_pdf_file(
-            pdf_bytes=pdf_bytes,
+        result = await run_pdf_processing(
+            pdf_path=pdf_path,
             filename=file.filename,
             method=method
         )
 
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
 
         logger.info(f"✅ 텍스트 추출 완료: {len(result['text'])}자")
 
@@ -225,12 +309,17 @@ async def extract_text_only(
             method=result['extraction_method']
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ 텍스트 추출 실패: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"텍스트 추출 실패: {str(e)}"
         )
+    finally:
+        if pdf_path:
+            os.unlink(pdf_path)
 
 @app.get("/ask-stream")
 async def ask_question_stream(
@@ -257,18 +346,23 @@ async def ask_question_stream(
         top_k=top_k
     )
 
-    return StreamingResponse(
+    # async 제너레이터를 그대로 전달 (이벤트 루프에서 직접 소비)
+    # keep-alive ping과 프록시 버퍼링 비활성화 헤더는 EventSourceResponse가 처리
+    return EventSourceResponse(
         ask_handler.stream_response(request),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type",
-        }
+        ping=15,
+        sep="\n",
     )
 
+@app.post("/cache/invalidate")
+async def invalidate_answer_cache():
+    """
+    답변 캐시 무효화 (문서 벡터 저장 후 프론트엔드가 호출, 모든 워커에 반영)
+    """
+    ask_handler.cache.invalidate()
+    logger.info("🧹 답변 캐시 무효화")
+    return {"ok": True}
+
 # 에러 핸들러
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
@@ -300,10 +394,18 @@ if __name__ == "__main__":
     logger.info(f"📄 최대 파일 크기: {MAX_FILE_SIZE}MB")
     logger.info(f"🔗 프론트엔드 URL: {FRONTEND_URL}")
 
+    # 개발 시에만 자동 리로드 (리로드 모드에서는 워커를 여러 개 둘 수 없음)
+    reload = os.getenv('UVICORN_RELOAD', 'false').lower() == 'true'
+
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
-        reload=True,
-        log_level="info"
+        reload=reload,
+        workers=None if reload else int(os.getenv('WEB_CONCURRENCY', '1')),
+        # auto: uvloop/httptools가 설치되어 있으면 사용하고, 없으면(예: Windows) 기본 구현으로 실행
+        loop=os.getenv('UVICORN_LOOP', 'auto'),
+        http=os.getenv('UVICORN_HTTP', 'auto'),
+        access_log=False,
+        log_level="warning"
     )
\ No newline at end of file
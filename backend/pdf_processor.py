@@ -1,20 +1,83 @@
 """
 PDF 처리 모듈 - PyMuPDF 기반 고품질 텍스트 추출 및 청킹
 """
+import os
 import fitz  # PyMuPDF
 import pymupdf4llm
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 import logging
 from pathlib import Path
 logger = logging.getLogger(__name__)
 
+# 손상된 PDF의 MuPDF 오류 메시지를 stderr로 출력하지 않음 (예외로 처리)
+fitz.TOOLS.mupdf_display_errors(False)
+
+# PDF 입력: 메모리상의 바이트, 디스크에 저장된 파일 경로 또는 이미 열린 문서
+PdfSource = Union[bytes, str, fitz.Document]
+
+# 구조 추출용 get_text("dict") 플래그: 이미지 블록은 사용하지 않으므로 이미지 바이너리 복사 제외
+STRUCTURED_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# 마크다운 테이블 셀 이스케이프: 셀 안의 '|'와 줄바꿈이 행 구조를 깨지 않도록 한 번의 translate로 치환
+MD_CELL_ESCAPE = str.maketrans({'|': '\\|', '\n': ' ', '\r': ' '})
+
+
+def open_pdf(pdf_source: PdfSource) -> fitz.Document:
+    """바이트 또는 파일 경로로부터 PDF 문서 열기 (이미 열린 문서는 그대로 반환)"""
+    if isinstance(pdf_source, fitz.Document):
+        return pdf_source
+    if isinstance(pdf_source, (bytes, bytearray)):
+        return fitz.open(stream=pdf_source, filetype="pdf")
+    return fitz.open(pdf_source, filetype="pdf")
+
+
+class TextBlock(NamedTuple):
+    """구조적 추출의 텍스트 블록"""
+    text: str
+    bbox: Tuple[float, float, float, float]
+    type: str = 'text'
+
+
+class TableBlock(NamedTuple):
+    """구조적 추출의 테이블 (행 단위 셀 목록)"""
+    data: List[List[Any]]
+    bbox: Tuple[float, float, float, float]
+    type: str = 'table'
+
+
+class PageContent(NamedTuple):
+    """구조적 추출의 페이지 단위 결과 (페이지마다 dict를 만드는 대신 튜플 기반 레코드 사용)"""
+    page_number: int
+    text_blocks: List[TextBlock]
+    tables: List[TableBlock]
+    images: List[Any]
+
+
+def markdown_cell(cell: Any) -> str:
+    """테이블 셀 값을 마크다운 셀 문자열로 변환 (None/빈 값은 빈 문자열)"""
+    if cell is None or cell == '':
+        return ''
+    return (cell if isinstance(cell, str) else str(cell)).translate(MD_CELL_ESCAPE)
+
+
+def close_pdf(doc: fitz.Document, pdf_source: PdfSource) -> None:
+    """open_pdf로 새로 연 문서만 닫음 (호출자가 넘긴 문서는 호출자가 닫음)"""
+    if doc is not pdf_source:
+        doc.close()
+
 
 class TextChunker:
     """Python에서 텍스트 청킹을 담당하는 클래스"""
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, strategy: str = 'sliding'):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"청크 오버랩은 청크 크기보다 작아야 합니다. (크기: {chunk_size}, 오버랩: {chunk_overlap})"
+            )
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        # 'sliding': 단일 패스 윈도우 스캔 (기본), 'recursive': 구분자별 재귀 분할
+        self.strategy = strategy
 
         # 한국어에 최적화된 구분자
         self.separators = [
@@ -35,7 +98,7 @@ class TextChunker:
         """텍스트를 청크로 분할"""
         logger.info(f"청킹 시작: 텍스트 길이 {len(text)}자")
 
-        if not text or len(text.strip()) == 0:
+        if not text or text.isspace():
             logger.warning("빈 텍스트로 인한 청킹 실패")
             return []
 
@@ -44,13 +107,87 @@ class TextChunker:
             logger.info(f"텍스트가 청크 크기보다 작음: {len(text)} <= {self.chunk_size}")
             return [text.strip()]
 
-        chunks = self._recursive_split(text, self.separators)
+        if self.strategy == 'recursive':
+            chunks = self._recursive_split(text, self.separators)
+        else:
+            chunks = self.split_text_sliding(text)
         logger.info(f"청킹 완료: {len(chunks)}개 청크 생성")
         return chunks
 
+    def split_text_sliding(self, text: str) -> List[str]:
+        """텍스트를 한 번만 앞으로 훑으며 청크로 분할
+
+        각 윈도우 [p + chunk_size // 2, p + chunk_size] 안에서 우선순위가 가장 높은
+        구분자의 마지막 위치를 rfind로 찾아 경계로 삼고, 오버랩만큼 되돌아가 다음 청크를 시작
+        (오버랩이 크면 윈도우 시작을 늦춰 청크마다 최소 (chunk_size - chunk_overlap) // 4 전진)
+        """
+        chunks = []
+        self._slide(text, 0, chunks, final=True)
+        return chunks
+
+    def _slide(self, text: str, p: int, chunks: List[str], final: bool) -> int:
+        """위치 p부터 윈도우 경계를 찾아 청크를 추가하고 다음 청크 시작 위치 반환
+
+        final이 False면 남은 텍스트가 한 윈도우보다 짧아지는 지점에서 멈춤 (뒤에 이어질 텍스트가 경계를 바꿀 수 있음)
+        """
+        n = len(text)
+
+        # 경계를 최소 p + window_offset 이후에서 찾으므로 다음 청크는 항상 min_stride 이상 전진
+        # (오버랩이 chunk_size의 1/3을 넘을 때만 윈도우 시작이 chunk_size // 2보다 뒤로 밀림)
+        min_stride = max(1, (self.chunk_size - self.chunk_overlap) // 4)
+        window_offset = max(self.chunk_size // 2, self.chunk_overlap + min_stride)
+
+        while p < n:
+            target = p + self.chunk_size
+            if target >= n:
+                if not final:
+                    return p
+                self._emit(text, p, n, chunks)
+                return n
+
+            # 우선순위 순서로 윈도우 안의 마지막 구분자 탐색, 없으면 문자 단위로 자름
+            boundary = target
+            window_start = p + window_offset
+            for separator in self.separators:
+                if not separator:
+                    break
+                idx = text.rfind(separator, window_start, target)
+                if idx != -1:
+                    boundary = idx + len(separator)
+                    break
+
+            self._emit(text, p, boundary, chunks)
+
+            if self.chunk_overlap <= 0:
+                p = boundary
+                continue
+
+            # 오버랩 시작점은 단어 중간이 되지 않도록 다음 공백 뒤로 맞춤
+            overlap_start = boundary - self.chunk_overlap
+            space = text.find(' ', overlap_start, boundary)
+            if space != -1:
+                overlap_start = space + 1
+            p = max(overlap_start, p + 1)
+
+        return p
+
+    def stream(self) -> 'ChunkStream':
+        """페이지 단위로 텍스트를 이어 받아 청킹하는 스트림 생성 (호출마다 새 상태, 청커 자체는 상태 없음)"""
+        return ChunkStream(self)
+
+    @staticmethod
+    def _emit(text: str, start: int, end: int, out: List[str]) -> None:
+        """text[start:end]의 앞뒤 공백을 오프셋으로 건너뛰고 한 번만 잘라 추가 (공백뿐이면 생략)"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            out.append(text[start:end])
+
     def _recursive_split(self, text: str, separators: List[str]) -> List[str]:
         """재귀적으로 텍스트 분할"""
-        if not text.strip():
+        if not text or text.isspace():
             return []
 
         # 현재 사용할 구분자 선택
@@ -59,23 +196,15 @@ class TextChunker:
 
         # 구분자로 텍스트 분할
         if separator == '':
-            # 문자 단위 분할 (최후의 수단)
+            # 문자 단위 분할 (최후의 수단): chunk_size 길이로 잘라냄
             chunks = []
-            current_chunk = ''
-            for char in text:
-                if len(current_chunk + char) <= self.chunk_size:
-                    current_chunk += char
-                else:
-                    if current_chunk.strip():
-                        chunks.append(current_chunk.strip())
-                    current_chunk = char
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
+            for start in range(0, len(text), self.chunk_size):
+                self._emit(text, start, min(start + self.chunk_size, len(text)), chunks)
             return chunks
 
         splits = text.split(separator)
         if not splits:
-            return [text.strip()] if text.strip() else []
+            return [text.strip()]
 
         # 분할된 텍스트들을 처리
         current_doc = ''
@@ -85,11 +214,13 @@ class TextChunker:
             # 구분자 복원 (마지막 요소가 아닌 경우에만)
             reconstructed = split + separator if i < len(splits) - 1 else split
 
-            if len(current_doc + reconstructed) <= self.chunk_size:
+            # 길이 비교만 필요하므로 문자열을 이어 붙이지 않고 길이 합으로 확인
+            if len(current_doc) + len(reconstructed) <= self.chunk_size:
                 current_doc += reconstructed
             else:
-                if current_doc.strip():
-                    docs.append(current_doc.strip())
+                piece = current_doc.strip()
+                if piece:
+                    docs.append(piece)
                     current_doc = ''
 
                 # 현재 분할이 너무 크면 더 작은 구분자로 재귀 분할
@@ -100,12 +231,13 @@ class TextChunker:
                     current_doc = reconstructed
 
         # 마지막 문서 추가
-        if current_doc.strip():
-            docs.append(current_doc.strip())
+        piece = current_doc.strip()
+        if piece:
+            docs.append(piece)
 
-        # 빈 docs 배열 방지
+        # 빈 docs 배열 방지 (위에서 공백만 있는 텍스트는 이미 걸러짐)
         if not docs:
-            return [text.strip()] if text.strip() else []
+            return [text.strip()]
 
         # 오버랩이 있는 청크 생성
         return self._create_overlapping_chunks(docs)
@@ -131,8 +263,9 @@ class TextChunker:
             if len(chunk) > self.chunk_size:
                 chunk = self._truncate_to_size(chunk, self.chunk_size)
 
-            if chunk.strip():
-                chunks.append(chunk.strip())
+            chunk = chunk.strip()
+            if chunk:
+                chunks.append(chunk)
 
         return chunks
 
@@ -141,117 +274,182 @@ class TextChunker:
         if len(text) <= max_length:
             return text
 
-        # 단어 경계를 고려하여 자르기
-        words = text.split(' ')
-        overlap = ''
-
-        for i in range(len(words) - 1, -1, -1):
-            candidate = ' '.join(words[i:])
-            if len(candidate) <= max_length:
-                overlap = candidate
-                break
+        # 단어 경계를 고려하여 자르기: 마지막 단어가 들어가면 사용, 아니면 문자 단위
+        last_word = text[text.rfind(' ') + 1:]
+        if last_word and len(last_word) <= max_length:
+            return last_word
 
-        return overlap or text[-max_length:]
+        return text[-max_length:]
 
     def _truncate_to_size(self, text: str, max_size: int) -> str:
         """텍스트를 지정된 크기로 자르기"""
         if len(text) <= max_size:
             return text
 
-        # 단어 경계를 고려하여 자르기
-        words = text.split(' ')
-        result = ''
-
-        for word in words:
-            candidate = result + ' ' + word if result else word
-            if len(candidate) <= max_size:
-                result = candidate
-            else:
-                break
+        # 단어 경계를 고려하여 자르기: max_size 안에 들어가는 마지막 공백까지
+        idx = text.rfind(' ', 0, max_size + 1)
+        if idx > 0:
+            return text[:idx]
 
         # 단어로 자를 수 없으면 문자 단위로 자르기
-        if not result and len(text) > 0:
-            result = text[:max_size]
+        return text[:max_size]
 
-        return result
+
+class ChunkStream:
+    """TextChunker 하나를 공유하는 호출별 스트리밍 청킹 상태 (feed/finalize)"""
+
+    def __init__(self, chunker: TextChunker):
+        self.chunker = chunker
+        self._carry = ''
+        self._parts: List[str] = []
+        self._fed = False
+
+    def feed(self, text: str) -> List[str]:
+        """페이지 단위 텍스트를 이어 받아 경계가 확정된 청크만 반환
+
+        조각 사이는 '\n\n'으로 이어지며, 결과는 전체를 결합해 split_text()한 것과 같음.
+        아직 확정되지 않은 꼬리(한 윈도우 미만)만 다음 호출로 넘기므로 문서 전체 문자열을 만들지 않음
+        """
+        if self.chunker.strategy == 'recursive':
+            # 재귀 분할은 전체 텍스트가 필요하므로 finalize()에서 한 번에 처리
+            self._parts.append(text)
+            return []
+
+        buffer = self._carry + '\n\n' + text if self._fed else text
+        self._fed = True
+
+        chunks = []
+        p = self.chunker._slide(buffer, 0, chunks, final=False)
+        self._carry = buffer[p:]
+        return chunks
+
+    def finalize(self) -> List[str]:
+        """feed()로 받은 나머지 텍스트를 청크로 만들어 반환"""
+        if self.chunker.strategy == 'recursive':
+            return self.chunker.split_text('\n\n'.join(self._parts))
+
+        chunks = []
+        self.chunker._slide(self._carry, 0, chunks, final=True)
+        self._carry = ''
+        return chunks
 
 
 class PDFProcessor:
     """PDF 문서 처리를 위한 클래스"""
 
-    def __init__(self, max_file_size_mb: int = 50):
+    def __init__(self, max_file_size_mb: int = 50, chunk_size: int = 1000, chunk_overlap: int = 200):
         self.max_file_size_mb = max_file_size_mb
         self.max_file_size_bytes = max_file_size_mb * 1024 * 1024
+        # 청커는 한 번만 만들어 모든 문서 처리에서 재사용
+        self.chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
-    def validate_pdf(self, pdf_bytes: bytes, filename: str = "") -> None:
+    def validate_pdf(self, pdf_source: Union[bytes, str], filename: str = "") -> None:
         """PDF 파일 유효성 검사"""
+        self.open_validated_pdf(pdf_source, filename).close()
+
+    def open_validated_pdf(self, pdf_source: Union[bytes, str], filename: str = "") -> fitz.Document:
+        """PDF 파일 유효성 검사 후 열린 문서 반환 (검사와 추출이 한 번의 파싱을 공유)"""
         # 파일 크기 검사
-        if len(pdf_bytes) > self.max_file_size_bytes:
-            size_mb = len(pdf_bytes) / (1024 * 1024)
+        if isinstance(pdf_source, (bytes, bytearray)):
+            file_size = len(pdf_source)
+            header = pdf_source[:4]
+        else:
+            file_size = os.path.getsize(pdf_source)
+            with open(pdf_source, 'rb') as f:
+                header = f.read(4)
+
+        if file_size > self.max_file_size_bytes:
+            size_mb = file_size / (1024 * 1024)
             raise ValueError(
                 f"파일이 너무 큽니다. 최대 {self.max_file_size_mb}MB 까지 지원합니다. "
                 f"(현재: {size_mb:.1f}MB)"
             )
 
         # PDF 시그니처 확인
-        if not pdf_bytes.startswith(b'%PDF'):
+        if not header.startswith(b'%PDF'):
             raise ValueError("올바른 PDF 파일이 아닙니다.")
 
-        # PyMuPDF로 문서 열기 테스트
+        # PyMuPDF로 문서 열기
+        doc = None
         try:
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+            doc = open_pdf(pdf_source)
             if doc.page_count == 0:
                 raise ValueError("빈 PDF 파일입니다.")
-            doc.close()
         except Exception as e:
+            if doc is not None:
+                doc.close()
             raise ValueError(f"PDF 파일을 읽을 수 없습니다: {str(e)}")
 
-    def extract_text_pymupdf4llm(self, pdf_bytes: bytes, filename: str = "") -> Dict:
-        """pymupdf4llm을 사용한 고품질 텍스트 추출"""
+        return doc
+
+    def extract_text_pymupdf4llm(
+        self, pdf_source: PdfSource, filename: str = "", chunker: Optional[TextChunker] = None
+    ) -> Dict:
+        """pymupdf4llm을 사용한 고품질 텍스트 추출
+
+        chunker가 주어지면 페이지별 마크다운을 바로 청커에 흘려 넣고 전체 텍스트 대신 'chunks'를 반환
+        """
         try:
             logger.info(f"PDF 텍스트 추출 시작: {filename}")
 
-            # 임시 파일로 저장 후 처리
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                tmp_file.write(pdf_bytes)
-                tmp_file.flush()
-
+            # 바이트는 메모리에서 바로 열어 전달 (임시 파일 쓰기/읽기 없음)
+            doc = open_pdf(pdf_source)
+            try:
                 # pymupdf4llm로 마크다운 변환
                 md_result = pymupdf4llm.to_markdown(
-                    tmp_file.name,
+                    doc,
                     page_chunks=True,  # 페이지별 청크 생성
                     write_images=False,  # 이미지 추출 비활성화
-                    image_size_limit=0,  # 이미지 크기 제한
                     force_text=True,  # 텍스트 추출 강제
                 )
-                # page_chunks=True일 때 리스트를 반환하므로 결합
-                if isinstance(md_result, list):
-                    # 각 항목이 딕셔너리인 경우 텍스트 부분만 추출
-                    if md_result and isinstance(md_result[0], dict):
-                        md_text = '\n\n'.join([chunk.get('text', str(chunk)) for chunk in md_result])
+
+                # 같은 문서 객체에서 기본 메타데이터 추출 (두 번째 open 없음, doc.metadata는 한 번만 읽음)
+                doc_metadata = doc.metadata or {}
+                metadata = {
+                    'page_count': doc.page_count,
+                    'title': doc_metadata.get('title', ''),
+                    'author': doc_metadata.get('author', ''),
+                    'subject': doc_metadata.get('subject', ''),
+                    'creator': doc_metadata.get('creator', ''),
+                    'producer': doc_metadata.get('producer', ''),
+                    'creation_date': doc_metadata.get('creationDate', ''),
+                    'modification_date': doc_metadata.get('modDate', ''),
+                }
+            finally:
+                close_pdf(doc, pdf_source)
+
+            if chunker is not None:
+                # 페이지 마크다운을 결합하지 않고 순서대로 청킹
+                pages = md_result if isinstance(md_result, list) else [md_result]
+                stream = chunker.stream()
+                chunks = []
+                for chunk in pages:
+                    if isinstance(chunk, dict) and 'text' in chunk:
+                        chunks.extend(stream.feed(chunk['text']))
                     else:
-                        md_text = '\n\n'.join([str(chunk) for chunk in md_result])
-                else:
-                    md_text = str(md_result)
+                        chunks.extend(stream.feed(str(chunk)))
+                chunks.extend(stream.finalize())
 
-            # 임시 파일 삭제
-            import os
-            os.unlink(tmp_file.name)
+                logger.info(f"텍스트 추출 및 청킹 완료: {len(chunks)}개 청크, {metadata['page_count']}페이지")
 
-            # 기본 메타데이터 추출
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            metadata = {
-                'page_count': doc.page_count,
-                'title': doc.metadata.get('title', ''),
-                'author': doc.metadata.get('author', ''),
-                'subject': doc.metadata.get('subject', ''),
-                'creator': doc.metadata.get('creator', ''),
-                'producer': doc.metadata.get('producer', ''),
-                'creation_date': doc.metadata.get('creationDate', ''),
-                'modification_date': doc.metadata.get('modDate', ''),
-            }
-            doc.close()
+                return {
+                    'chunks': chunks,
+                    'metadata': metadata,
+                    'extraction_method': 'pymupdf4llm',
+                    'filename': filename,
+                }
+
+            # page_chunks=True일 때 리스트를 반환하므로 결합
+            if isinstance(md_result, list):
+                # 각 항목이 딕셔너리인 경우 텍스트 부분만 추출
+                if md_result and isinstance(md_result[0], dict):
+                    md_text = '\n\n'.join(
+                        chunk['text'] if 'text' in chunk else str(chunk) for chunk in md_result
+                    )
+                else:
+                    md_text = '\n\n'.join(str(chunk) for chunk in md_result)
+            else:
+                md_text = str(md_result)
 
             logger.info(f"텍스트 추출 완료: {len(md_text)}자, {metadata['page_count']}페이지")
 
@@ -265,14 +463,14 @@ class PDFProcessor:
         except Exception as e:
             logger.error(f"pymupdf4llm 추출 실패: {str(e)}")
             # 폴백: 기본 PyMuPDF 추출
-            return self.extract_text_basic(pdf_bytes, filename)
+            return self.extract_text_basic(pdf_source, filename)
 
-    def extract_text_basic(self, pdf_bytes: bytes, filename: str = "") -> Dict:
+    def extract_text_basic(self, pdf_source: PdfSource, filename: str = "") -> Dict:
         """기본 PyMuPDF를 사용한 텍스트 추출 (폴백)"""
         try:
             logger.info(f"기본 PDF 텍스트 추출: {filename}")
 
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+            doc = open_pdf(pdf_source)
 
             # 텍스트 추출
             text_blocks = []
@@ -281,24 +479,29 @@ class PDFProcessor:
 
                 # 페이지 텍스트 추출
                 page_text = page.get_text()
-                if page_text.strip():
-                    text_blocks.append(f"# 페이지 {page_num + 1}\n\n{page_text}")
-
-            # 메타데이터 추출
+                if page_text and not page_text.isspace():
+                    # 헤더와 본문을 따로 넣어 페이지별 임시 문자열 생성 없이 마지막에 한 번만 결합
+                    if text_blocks:
+                        text_blocks.append('\n\n')
+                    text_blocks.append(f"# 페이지 {page_num + 1}\n\n")
+                    text_blocks.append(page_text)
+
+            # 메타데이터 추출 (doc.metadata는 한 번만 읽음)
+            doc_metadata = doc.metadata or {}
             metadata = {
                 'page_count': doc.page_count,
-                'title': doc.metadata.get('title', ''),
-                'author': doc.metadata.get('author', ''),
-                'subject': doc.metadata.get('subject', ''),
-                'creator': doc.metadata.get('creator', ''),
-                'producer': doc.metadata.get('producer', ''),
-                'creation_date': doc.metadata.get('creationDate', ''),
-                'modification_date': doc.metadata.get('modDate', ''),
+                'title': doc_metadata.get('title', ''),
+                'author': doc_metadata.get('author', ''),
+                'subject': doc_metadata.get('subject', ''),
+                'creator': doc_metadata.get('creator', ''),
+                'producer': doc_metadata.get('producer', ''),
+                'creation_date': doc_metadata.get('creationDate', ''),
+                'modification_date': doc_metadata.get('modDate', ''),
             }
 
-            doc.close()
+            close_pdf(doc, pdf_source)
 
-            combined_text = '\n\n'.join(text_blocks)
+            combined_text = ''.join(text_blocks)
 
             logger.info(f"기본 텍스트 추출 완료: {len(combined_text)}자")
 
@@ -313,46 +516,47 @@ class PDFProcessor:
             logger.error(f"기본 텍스트 추출 실패: {str(e)}")
             raise ValueError(f"PDF 텍스트 추출 실패: {str(e)}")
 
-    def extract_text_with_structure(self, pdf_bytes: bytes, filename: str = "") -> Dict:
+    def extract_text_with_structure(self, pdf_source: PdfSource, filename: str = "") -> Dict:
         """구조 정보를 포함한 고급 텍스트 추출"""
         try:
             logger.info(f"구조적 PDF 텍스트 추출: {filename}")
 
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+            doc = open_pdf(pdf_source)
 
             structured_content = []
 
             for page_num in range(doc.page_count):
                 page = doc.load_page(page_num)
 
-                # 텍스트 블록 추출 (위치 정보 포함)
-                blocks = page.get_text("dict")
+                page_content = PageContent(page_num + 1, [], [], [])
 
-                page_content = {
-                    'page_number': page_num + 1,
-                    'text_blocks': [],
-                    'tables': [],
-                    'images': []
-                }
+                # 텍스트가 없는 페이지(스캔/이미지 전용)는 dict 추출과 테이블 탐지를 건너뜀
+                raw_text = page.get_text("text")
+                if not raw_text or raw_text.isspace():
+                    structured_content.append(page_content)
+                    continue
+
+                # 텍스트 블록 추출 (위치 정보 포함)
+                blocks = page.get_text("dict", flags=STRUCTURED_TEXT_FLAGS)
 
                 for block in blocks.get('blocks', []):
                     if 'lines' in block:  # 텍스트 블록
-                        block_text = []
+                        # 스팬 텍스트와 구분자(스팬 사이 ' ', 줄 사이 '\n')를 평탄한 리스트에 모아 블록당 한 번만 결합
+                        block_parts = []
                         for line in block['lines']:
-                            line_text = []
+                            separator = '\n' if block_parts else ''
                             for span in line['spans']:
                                 text = span['text'].strip()
                                 if text:
-                                    line_text.append(text)
-                            if line_text:
-                                block_text.append(' '.join(line_text))
+                                    if separator:
+                                        block_parts.append(separator)
+                                    block_parts.append(text)
+                                    separator = ' '
 
-                        if block_text:
-                            page_content['text_blocks'].append({
-                                'text': '\n'.join(block_text),
-                                'bbox': block['bbox'],
-                                'type': 'text'
-                            })
+                        if block_parts:
+                            page_content.text_blocks.append(
+                                TextBlock(''.join(block_parts), block['bbox'])
+                            )
 
                 # 테이블 탐지 (간단한 휴리스틱)
                 tables = page.find_tables()
@@ -360,28 +564,25 @@ class PDFProcessor:
                     try:
                         table_data = table.extract()
                         if table_data:
-                            page_content['tables'].append({
-                                'data': table_data,
-                                'bbox': table.bbox,
-                                'type': 'table'
-                            })
+                            page_content.tables.append(TableBlock(table_data, table.bbox))
                     except Exception as e:
                         logger.warning(f"테이블 추출 실패 (페이지 {page_num + 1}): {str(e)}")
 
                 structured_content.append(page_content)
 
-            # 메타데이터
+            # 메타데이터 (doc.metadata는 한 번만 읽음)
+            doc_metadata = doc.metadata or {}
             metadata = {
                 'page_count': doc.page_count,
-                'title': doc.metadata.get('title', ''),
-                'author': doc.metadata.get('author', ''),
-                'subject': doc.metadata.get('subject', ''),
-                'has_tables': any(page['tables'] for page in structured_content),
-                'total_text_blocks': sum(len(page['text_blocks']) for page in structured_content),
-                'total_tables': sum(len(page['tables']) for page in structured_content),
+                'title': doc_metadata.get('title', ''),
+                'author': doc_metadata.get('author', ''),
+                'subject': doc_metadata.get('subject', ''),
+                'has_tables': any(page.tables for page in structured_content),
+                'total_text_blocks': sum(len(page.text_blocks) for page in structured_content),
+                'total_tables': sum(len(page.tables) for page in structured_content),
             }
 
-            doc.close()
+            close_pdf(doc, pdf_source)
 
             # 텍스트로 변환
             markdown_text = self.convert_structured_to_markdown(structured_content)
@@ -399,33 +600,33 @@ class PDFProcessor:
         except Exception as e:
             logger.error(f"구조적 텍스트 추출 실패: {str(e)}")
             # 폴백: 기본 텍스트 추출
-            return self.extract_text_basic(pdf_bytes, filename)
+            return self.extract_text_basic(pdf_source, filename)
 
-    def convert_structured_to_markdown(self, structured_content: List[Dict]) -> str:
+    def convert_structured_to_markdown(self, structured_content: List[PageContent]) -> str:
         """구조화된 콘텐츠를 마크다운으로 변환"""
         markdown_parts = []
 
         for page in structured_content:
-            page_num = page['page_number']
+            page_num = page.page_number
             markdown_parts.append(f"# 페이지 {page_num}\n")
 
             # 텍스트 블록
-            for block in page['text_blocks']:
-                text = block['text'].strip()
+            for block in page.text_blocks:
+                text = block.text.strip()
                 if text:
                     markdown_parts.append(text)
                     markdown_parts.append("")  # 빈 줄
 
             # 테이블
-            for table in page['tables']:
+            for table in page.tables:
                 markdown_parts.append("## 테이블\n")
                 try:
                     # 테이블을 마크다운 형식으로 변환
-                    table_data = table['data']
+                    table_data = table.data
                     if table_data and len(table_data) > 0:
                         # 헤더
                         if len(table_data[0]) > 0:
-                            header = " | ".join(str(cell) for cell in table_data[0])
+                            header = " | ".join(map(markdown_cell, table_data[0]))
                             separator = " | ".join("---" for _ in table_data[0])
                             markdown_parts.append(f"| {header} |")
                             markdown_parts.append(f"| {separator} |")
@@ -433,7 +634,7 @@ class PDFProcessor:
                         # 데이터 행
                         for row in table_data[1:]:
                             if row:  # 빈 행 건너뛰기
-                                row_text = " | ".join(str(cell) if cell else "" for cell in row)
+                                row_text = " | ".join(map(markdown_cell, row))
                                 markdown_parts.append(f"| {row_text} |")
 
                         markdown_parts.append("")  # 빈 줄
@@ -445,17 +646,20 @@ class PDFProcessor:
 
         return "\n".join(markdown_parts)
 
-    def process_pdf(self, pdf_bytes: bytes, filename: str = "", method: str = "auto") -> Dict:
+    def process_pdf(self, pdf_source: PdfSource, filename: str = "", method: str = "auto") -> Dict:
         """PDF 처리 및 텍스트 청킹 메인 함수"""
-        # 유효성 검사
-        self.validate_pdf(pdf_bytes, filename)
-
-        # 텍스트 추출
-        extraction_result = self._extract_text(pdf_bytes, filename, method)
+        # 유효성 검사 때 연 문서를 텍스트 추출에도 그대로 사용 (PDF 파싱 1회)
+        doc = self.open_validated_pdf(pdf_source, filename)
+        try:
+            extraction_result = self._extract_text(doc, filename, method, chunker=self.chunker)
+        finally:
+            doc.close()
 
-        # 텍스트 청킹
-        chunker = TextChunker(chunk_size=1000, chunk_overlap=200)
-        chunks = chunker.split_text(extraction_result['text'])
+        # 텍스트 청킹 (pymupdf4llm은 추출 중에 이미 페이지 단위로 청킹함)
+        if 'chunks' in extraction_result:
+            chunks = extraction_result['chunks']
+        else:
+            chunks = self.chunker.split_text(extraction_result['text'])
 
         logger.info(f"텍스트 청킹 완료: {len(chunks)}개 청크 생성")
 
@@ -469,27 +673,47 @@ class PDFProcessor:
             'chunk_count': len(chunks),
         }
 
-    def _extract_text(self, pdf_bytes: bytes, filename: str = "", method: str = "auto") -> Dict:
-        """내부 텍스트 추출 함수"""
+    def _extract_text(
+        self,
+        pdf_source: PdfSource,
+        filename: str = "",
+        method: str = "auto",
+        chunker: Optional[TextChunker] = None,
+    ) -> Dict:
+        """내부 텍스트 추출 함수 (chunker는 페이지 단위 스트리밍 청킹이 가능한 추출기에만 전달)"""
         # 추출 방법 선택
         if method == "auto":
             # 자동 선택: pymupdf4llm 우선, 실패시 폴백
             try:
-                return self.extract_text_pymupdf4llm(pdf_bytes, filename)
+                return self.extract_text_pymupdf4llm(pdf_source, filename, chunker=chunker)
             except Exception as e:
                 logger.warning(f"pymupdf4llm 실패, 구조적 추출로 폴백: {str(e)}")
-                return self.extract_text_with_structure(pdf_bytes, filename)
+                return self.extract_text_with_structure(pdf_source, filename)
         elif method == "pymupdf4llm":
-            return self.extract_text_pymupdf4llm(pdf_bytes, filename)
+            return self.extract_text_pymupdf4llm(pdf_source, filename, chunker=chunker)
         elif method == "structured":
-            return self.extract_text_with_structure(pdf_bytes, filename)
+            return self.extract_text_with_structure(pdf_source, filename)
         elif method == "basic":
-            return self.extract_text_basic(pdf_bytes, filename)
+            return self.extract_text_basic(pdf_source, filename)
         else:
             raise ValueError(f"지원하지 않는 추출 방법: {method}")
 
 
-def process_pdf_file(pdf_bytes: bytes, filename: str = "", method: str = "auto") -> Dict:
-    """PDF 파일 처리 편의 함수"""
-    processor = PDFProcessor()
-    return processor.process_pdf(pdf_bytes, filename, method)
\ No newline at end of file
+def process_pdf_file(
+    pdf_bytes: Optional[bytes] = None,
+    filename: str = "",
+    method: str = "auto",
+    pdf_path: Optional[str] = None,
+) -> Dict:
+    """PDF 파일 처리 편의 함수
+
+    pdf_path가 주어지면 파일을 메모리에 올리지 않고 디스크에서 직접 처리합니다.
+    """
+    if pdf_path is None and pdf_bytes is None:
+        raise ValueError("pdf_bytes 또는 pdf_path 중 하나가 필요합니다.")
+
+    return pdf_processor.process_pdf(pdf_path if pdf_path is not None else pdf_bytes, filename, method)
+
+
+# 글로벌 처리기 인스턴스 (워커 프로세스마다 한 번 생성되어 요청 간 재사용)
+pdf_processor = PDFProcessor()
@@ -0,0 +1,162 @@
+"""
+질문 임베딩 기반 시맨틱 응답 캐시
+동일하거나 유사한 질문에 대해 이전에 생성한 소스 정보와 LLM 답변을 재사용
+"""
+import os
+import time
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """정규화된 질문 임베딩의 코사인 유사도로 조회하는 프로세스 내 응답 캐시
+
+    stamp_path가 주어지면 invalidate()가 그 파일의 수정 시각을 갱신하고, 같은 파일을 보는
+    모든 프로세스(uvicorn 워커)의 캐시가 다음 접근 때 비워집니다.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 512,
+        dim: int = 384,
+        stamp_path: Optional[str] = None,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.dim = dim
+        self.stamp_path = stamp_path
+
+        # 링 버퍼: 가장 오래된 항목부터 덮어씀 (384차원 x 512개 = 약 0.75MB)
+        self._embeddings = np.zeros((max_entries, dim), dtype=np.float32)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._top_k = np.zeros(max_entries, dtype=np.int64)
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        self._slots_by_question: Dict[Tuple[str, int], int] = {}
+        self._next_slot = 0
+
+        # 무효화될 때마다 증가 (응답 생성 중에 무효화되면 그 결과는 저장하지 않음)
+        self.generation = 0
+        self._stamp_mtime = self._read_stamp()
+
+    @staticmethod
+    def _question_key(question: str) -> str:
+        return ' '.join(question.split()).lower()
+
+    def _normalize(self, embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.dim,):
+            return None
+
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def _read_stamp(self) -> Optional[int]:
+        if not self.stamp_path:
+            return None
+        try:
+            return os.stat(self.stamp_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _sync(self) -> None:
+        """다른 프로세스가 무효화했으면 로컬 캐시도 비움"""
+        if not self.stamp_path:
+            return
+        stamp = self._read_stamp()
+        if stamp != self._stamp_mtime:
+            self._stamp_mtime = stamp
+            self.clear()
+
+    def clear(self) -> None:
+        """이 프로세스의 모든 항목 제거"""
+        self._expires_at[:] = 0.0
+        self._entries = [None] * self.max_entries
+        self._slots_by_question.clear()
+        self._next_slot = 0
+        self.generation += 1
+
+    def invalidate(self) -> None:
+        """문서가 추가/삭제되었을 때 모든 프로세스의 캐시 무효화"""
+        if self.stamp_path:
+            with open(self.stamp_path, 'a'):
+                pass
+            now = time.time_ns()
+            os.utime(self.stamp_path, ns=(now, now))
+            self._stamp_mtime = self._read_stamp()
+        self.clear()
+
+    def lookup_question(self, question: str, top_k: int = 5) -> Optional[Dict[str, Any]]:
+        """질문 문자열과 top_k가 같은 항목 조회 (벡터 검색 이전 단계)"""
+        self._sync()
+        slot = self._slots_by_question.get((self._question_key(question), top_k))
+        if slot is None or self._expires_at[slot] <= time.monotonic():
+            return None
+        return self._entries[slot]
+
+    def lookup(self, embedding: List[float], top_k: int = 5) -> Optional[Dict[str, Any]]:
+        """top_k가 같은 항목 중 임베딩 유사도가 임계값 이상인 가장 가까운 항목 조회"""
+        self._sync()
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        similarities = self._embeddings @ query
+        similarities[(self._expires_at <= time.monotonic()) | (self._top_k != top_k)] = -1.0
+
+        slot = int(np.argmax(similarities))
+        similarity = float(similarities[slot])
+        if similarity < self.threshold:
+            return None
+
+        logger.info(f"시맨틱 캐시 적중: 유사도 {similarity:.3f}")
+        return self._entries[slot]
+
+    def insert(
+        self,
+        question: str,
+        embedding: List[float],
+        sources: List[Dict[str, Any]],
+        answer: str,
+        top_k: int = 5,
+        generation: Optional[int] = None,
+    ) -> None:
+        """질문 임베딩과 응답을 캐시에 저장
+
+        generation이 주어졌는데 그 사이 캐시가 무효화되었다면 이전 문서 기준 응답이므로 저장하지 않음
+        """
+        self._sync()
+        if generation is not None and generation != self.generation:
+            return
+
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.max_entries
+
+        previous = self._entries[slot]
+        if previous is not None:
+            previous_key = previous['question_key']
+            if self._slots_by_question.get(previous_key) == slot:
+                del self._slots_by_question[previous_key]
+
+        question_key = (self._question_key(question), top_k)
+        self._embeddings[slot] = vector
+        self._expires_at[slot] = time.monotonic() + self.ttl_seconds
+        self._top_k[slot] = top_k
+        self._entries[slot] = {
+            'question_key': question_key,
+            'sources': sources,
+            'answer': answer,
+        }
+        self._slots_by_question[question_key] = slot
@@ -0,0 +1,46 @@
+"""
+질문 응답 핸들러 테스트
+"""
+import asyncio
+import inspect
+
+from ask_handler import AskHandler
+
+
+def test_stream_response_is_async_generator():
+    """stream_response는 EventSourceResponse에 그대로 넘기므로 async generator 함수여야 함"""
+    assert inspect.isasyncgenfunction(AskHandler.stream_response)
+
+
+def test_cancelled_waiter_passes_wakeup_to_next_waiter():
+    """깨어난 직후 취소된 대기자가 있어도 다음 대기자가 Ollama 슬롯을 얻음"""
+
+    async def scenario():
+        handler = AskHandler()
+        handler.ollama_concurrency = 1
+        acquired = []
+        waiters = {}
+
+        async def holder():
+            async with handler.ollama_slot():
+                await asyncio.sleep(0.01)
+            # 슬롯 반환(notify) 직후, 깨어난 첫 대기자가 실행되기 전에 취소 (클라이언트 연결 종료)
+            waiters[1].cancel()
+
+        async def waiter(name):
+            async with handler.ollama_slot():
+                acquired.append(name)
+
+        holder_task = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiters[1] = asyncio.create_task(waiter(1))
+        waiters[2] = asyncio.create_task(waiter(2))
+
+        await holder_task
+        await asyncio.wait_for(waiters[2], timeout=1.0)
+        await handler.aclose()
+        return acquired, handler._ollama_active
+
+    acquired, active = asyncio.run(scenario())
+    assert acquired == [2]
+    assert active == 0
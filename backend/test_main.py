@@ -0,0 +1,52 @@
+"""
+FastAPI 앱 테스트
+"""
+import asyncio
+import os
+import signal
+
+import fitz
+import pytest
+
+import main
+
+
+@pytest.fixture
+def pdf_path(tmp_path) -> str:
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "PDF worker pool recovery test.", fontsize=12)
+    path = str(tmp_path / "test.pdf")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def pdf_executor():
+    main.app.state.pdf_executor = main.create_pdf_executor()
+    yield
+    main.app.state.pdf_executor.shutdown(wait=True, cancel_futures=True)
+
+
+def test_broken_worker_pool_fails_only_current_request(pdf_path, pdf_executor):
+    """워커가 죽어 풀이 깨지면 현재 요청만 실패하고 다음 요청은 새 풀에서 처리"""
+
+    async def scenario():
+        first = await main.run_pdf_processing(pdf_path, "test.pdf", "basic")
+        assert first['ok']
+
+        # 워커 프로세스 강제 종료 (MuPDF 세그폴트/OOM kill 상황)
+        broken_executor = main.app.state.pdf_executor
+        for process in list(broken_executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        await asyncio.sleep(0.5)
+
+        with pytest.raises(RuntimeError):
+            await main.run_pdf_processing(pdf_path, "test.pdf", "basic")
+        assert main.app.state.pdf_executor is not broken_executor
+
+        recovered = await main.run_pdf_processing(pdf_path, "test.pdf", "basic")
+        assert recovered['ok']
+
+    asyncio.run(scenario())
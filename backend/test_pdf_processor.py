@@ -0,0 +1,110 @@
+"""
+PDF 처리 모듈 테스트
+"""
+import fitz
+import pytest
+
+from pdf_processor import PDFProcessor, TextChunker, process_pdf_file
+
+
+@pytest.fixture
+def pdf_bytes() -> bytes:
+    """여러 페이지에 걸친 텍스트가 있는 테스트용 PDF"""
+    doc = fitz.open()
+    for page_num in range(6):
+        page = doc.new_page()
+        y = 72
+        for line_num in range(40):
+            page.insert_text(
+                (72, y),
+                f"Page {page_num} line {line_num}. The quick brown fox jumps over the lazy dog.",
+                fontsize=9,
+            )
+            y += 14
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_pymupdf4llm_streaming_chunks_match_join_then_split(pdf_bytes):
+    """pymupdf4llm 경로의 페이지 단위 청킹 결과가 전체 텍스트를 결합 후 분할한 결과와 같음"""
+    result = process_pdf_file(pdf_bytes, "test.pdf", method="pymupdf4llm")
+    assert result['extraction_method'] == 'pymupdf4llm'
+
+    extracted = PDFProcessor().extract_text_pymupdf4llm(pdf_bytes, "test.pdf")
+    assert extracted['extraction_method'] == 'pymupdf4llm'
+
+    expected = TextChunker().split_text(extracted['text'])
+    assert result['chunks'] == expected
+    assert result['chunk_count'] == len(expected)
+
+
+def test_auto_method_uses_pymupdf4llm(pdf_bytes):
+    """auto 방법은 pymupdf4llm을 우선 사용"""
+    result = process_pdf_file(pdf_bytes, "test.pdf", method="auto")
+    assert result['extraction_method'] == 'pymupdf4llm'
+    assert result['chunks']
+
+
+@pytest.mark.parametrize("strategy", ["sliding", "recursive"])
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(1000, 200), (64, 16), (200, 0)])
+def test_chunk_stream_matches_split_text(strategy, chunk_size, chunk_overlap):
+    """페이지를 나눠 feed한 결과가 '\\n\\n'으로 결합 후 split_text()한 결과와 같음"""
+    chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap, strategy=strategy)
+    sentence = "한국어 문서 처리와 text chunking 검색. "
+    pages = [sentence * count for count in (0, 3, 40, 1, 90, 0, 7)] + ["  \n", "마지막 페이지"]
+
+    stream = chunker.stream()
+    chunks = []
+    for page in pages:
+        chunks.extend(stream.feed(page))
+    chunks.extend(stream.finalize())
+
+    assert chunks == chunker.split_text('\n\n'.join(pages))
+
+
+def test_chunk_streams_do_not_share_state():
+    """같은 청커에서 만든 스트림을 번갈아 사용해도 서로의 텍스트가 섞이지 않음"""
+    chunker = TextChunker(chunk_size=100, chunk_overlap=20)
+    pages_a = ["alpha " * 50, "beta " * 50]
+    pages_b = ["가나다 " * 60, "라마바 " * 60]
+
+    stream_a, stream_b = chunker.stream(), chunker.stream()
+    chunks_a, chunks_b = [], []
+    for page_a, page_b in zip(pages_a, pages_b):
+        chunks_a.extend(stream_a.feed(page_a))
+        chunks_b.extend(stream_b.feed(page_b))
+    chunks_a.extend(stream_a.finalize())
+    chunks_b.extend(stream_b.finalize())
+
+    assert chunks_a == chunker.split_text('\n\n'.join(pages_a))
+    assert chunks_b == chunker.split_text('\n\n'.join(pages_b))
+
+
+@pytest.mark.parametrize("chunk_overlap", [600, 900])
+def test_sliding_chunker_keeps_advancing_with_large_overlap(chunk_overlap):
+    """오버랩이 chunk_size의 절반을 넘어도 청크마다 충분히 전진하고 청크 수가 폭증하지 않음"""
+    chunk_size = 1000
+    words = [f"w{i}" + (". " if i % 17 == 16 else " ") for i in range(60000)]
+    text = ''.join(words)
+    chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    chunks = chunker.split_text(text)
+
+    min_stride = (chunk_size - chunk_overlap) // 4
+    assert len(chunks) <= len(text) // min_stride + 1
+
+    # 모든 토큰이 고유하므로 각 청크의 시작 위치를 찾아 전진 폭을 확인
+    starts = []
+    position = 0
+    for chunk in chunks:
+        position = text.index(chunk, position)
+        starts.append(position)
+    assert all(b - a >= min_stride for a, b in zip(starts, starts[1:]))
+    assert text.rstrip().endswith(chunks[-1])
+
+
+def test_chunker_rejects_overlap_not_smaller_than_chunk_size():
+    """오버랩이 청크 크기 이상이면 설정 오류"""
+    with pytest.raises(ValueError):
+        TextChunker(chunk_size=100, chunk_overlap=100)
@@ -0,0 +1,127 @@
+"""
+시맨틱 응답 캐시 테스트
+"""
+import pytest
+
+import semantic_cache
+from semantic_cache import SemanticCache
+
+
+class FakeClock:
+    """time.monotonic 대체용 수동 시계"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time_ns(self) -> int:
+        return int(self.now * 1e9)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(semantic_cache, 'time', fake)
+    return fake
+
+
+def test_clear_invalidates_question_and_embedding_lookups():
+    """clear() 이후에는 질문 문자열/임베딩 조회 모두 적중하지 않음"""
+    cache = SemanticCache(max_entries=4, dim=3)
+    cache.insert("문서 요약해줘", [1.0, 0.0, 0.0], [{'id': 1}], "이전 답변")
+    assert cache.lookup_question("문서 요약해줘") is not None
+    assert cache.lookup([1.0, 0.0, 0.0]) is not None
+
+    cache.clear()
+
+    assert cache.lookup_question("문서 요약해줘") is None
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+
+    cache.insert("문서 요약해줘", [1.0, 0.0, 0.0], [{'id': 2}], "새 답변")
+    assert cache.lookup_question("문서 요약해줘")['answer'] == "새 답변"
+
+
+def test_lookup_respects_similarity_threshold():
+    """유사도가 임계값 이상일 때만 적중"""
+    cache = SemanticCache(threshold=0.95, max_entries=4, dim=2)
+    cache.insert("q", [1.0, 0.0], [], "답변")
+
+    assert cache.lookup([0.99, 0.1])['answer'] == "답변"  # 유사도 약 0.995
+    assert cache.lookup([0.9, 0.4]) is None  # 유사도 약 0.914
+
+
+def test_entries_expire_after_ttl(clock):
+    """TTL이 지나면 질문/임베딩 조회 모두 만료"""
+    cache = SemanticCache(ttl_seconds=60.0, max_entries=4, dim=2)
+    cache.insert("q", [1.0, 0.0], [], "답변")
+
+    clock.now += 59.0
+    assert cache.lookup_question("q") is not None
+    assert cache.lookup([1.0, 0.0]) is not None
+
+    clock.now += 1.0
+    assert cache.lookup_question("q") is None
+    assert cache.lookup([1.0, 0.0]) is None
+
+
+def test_ring_buffer_evicts_oldest_entry():
+    """가득 차면 가장 오래된 슬롯을 덮어쓰고 그 질문/임베딩은 더 이상 조회되지 않음"""
+    cache = SemanticCache(max_entries=2, dim=3)
+    cache.insert("q1", [1.0, 0.0, 0.0], [], "a1")
+    cache.insert("q2", [0.0, 1.0, 0.0], [], "a2")
+    cache.insert("q3", [0.0, 0.0, 1.0], [], "a3")
+
+    assert cache.lookup_question("q1") is None
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+    assert cache.lookup_question("q2")['answer'] == "a2"
+    assert cache.lookup_question("q3")['answer'] == "a3"
+
+
+def test_overwriting_stale_slot_keeps_newer_question_mapping():
+    """같은 질문이 다시 저장된 뒤 예전 슬롯이 덮어써져도 새 슬롯 매핑은 유지"""
+    cache = SemanticCache(max_entries=2, dim=3)
+    cache.insert("q1", [1.0, 0.0, 0.0], [], "old")  # 슬롯 0
+    cache.insert("q1", [1.0, 0.0, 0.0], [], "new")  # 슬롯 1 (q1 -> 1)
+    cache.insert("q2", [0.0, 1.0, 0.0], [], "a2")  # 슬롯 0 덮어씀
+
+    assert cache.lookup_question("q1")['answer'] == "new"
+    assert cache.lookup_question("q2")['answer'] == "a2"
+    assert sorted(cache._slots_by_question.values()) == [0, 1]
+
+
+def test_top_k_is_part_of_the_key():
+    """top_k가 다르면 질문/임베딩이 같아도 적중하지 않음"""
+    cache = SemanticCache(max_entries=4, dim=2)
+    cache.insert("q", [1.0, 0.0], [{'id': 1}], "top3 답변", top_k=3)
+
+    assert cache.lookup_question("q", top_k=3)['answer'] == "top3 답변"
+    assert cache.lookup_question("q", top_k=5) is None
+    assert cache.lookup([1.0, 0.0], top_k=3) is not None
+    assert cache.lookup([1.0, 0.0], top_k=5) is None
+
+
+def test_invalidate_reaches_other_instances_sharing_stamp_file(tmp_path):
+    """같은 스탬프 파일을 쓰는 다른 프로세스(인스턴스)의 캐시도 비워짐"""
+    stamp = str(tmp_path / "cache.stamp")
+    worker_a = SemanticCache(max_entries=4, dim=2, stamp_path=stamp)
+    worker_b = SemanticCache(max_entries=4, dim=2, stamp_path=stamp)
+    worker_b.insert("q", [1.0, 0.0], [], "업로드 전 답변")
+    assert worker_b.lookup_question("q") is not None
+
+    worker_a.invalidate()
+
+    assert worker_b.lookup_question("q") is None
+    assert worker_b.lookup([1.0, 0.0]) is None
+
+
+def test_insert_skipped_when_invalidated_during_generation():
+    """응답 생성 중 무효화되었다면 이전 문서 기준 답변은 저장하지 않음"""
+    cache = SemanticCache(max_entries=4, dim=2)
+    generation = cache.generation
+
+    cache.invalidate()
+    cache.insert("q", [1.0, 0.0], [], "업로드 전 답변", generation=generation)
+
+    assert cache.lookup_question("q") is None
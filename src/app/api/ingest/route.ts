@@ -6,6 +6,12 @@ import { v4 as uuidv4 } from 'uuid'
 // Supabase 클라이언트
 const supabase = createClient()
 
+// pgvector 텍스트 리터럴로 변환
+// 모델 출력은 float32이므로 유효숫자 9자리로 손실 없이 표현 가능 (JSON 배열 대비 약 35% 작음)
+function toVectorLiteral(embedding: ArrayLike<number>): string {
+  return '[' + Array.from(embedding, value => +value.toPrecision(9)).join(',') + ']'
+}
+
 export async function POST(request: NextRequest) {
   console.log('📁 PDF 인덱싱 요청 (Python → JavaScript 하이브리드)')
 
@@ -97,7 +103,7 @@ export async function POST(request: NextRequest) {
       id: `${docId}_${index}`,
       doc_id: docId,
       content: chunk,
-      embedding: embeddings[index],
+      embedding: toVectorLiteral(embeddings[index]),
       metadata: {
         doc_id: docId,
         source_name: file.name,
@@ -125,6 +131,13 @@ export async function POST(request: NextRequest) {
       )
     }
 
+    // 새 청크가 검색되므로 백엔드의 답변 캐시 무효화 (실패해도 업로드는 성공으로 처리)
+    try {
+      await fetch(`${backendUrl}/cache/invalidate`, { method: 'POST' })
+    } catch (error) {
+      console.warn('⚠️ 답변 캐시 무효화 실패:', error)
+    }
+
     // 사용자 문서 정보 저장 (옵션)
     if (userId && sessionId) {
       try {
@@ -58,6 +58,7 @@ export async function POST(request: NextRequest) {
         results: [],
         contexts: [],
         metadatas: [],
+        query_embedding: queryEmbedding,
         processing_time: searchTime,
         total_results: 0
       })
@@ -80,6 +81,7 @@ export async function POST(request: NextRequest) {
       results: searchResults,
       contexts,
       metadatas,
+      query_embedding: queryEmbedding, // Python 백엔드 시맨틱 캐시용
       processing_time: searchTime,
       total_results: searchResults.length,
       stats: {
@@ -1,5 +1,24 @@
+import { createHash } from 'crypto'
 import { pipeline, env, Pipeline } from '@xenova/transformers'
 
+const EMBEDDING_MODEL = 'Xenova/all-MiniLM-L6-v2'
+
+// 청크 임베딩 캐시 설정 (384차원 Float32 x 10000개 = 약 15MB)
+const EMBEDDING_CACHE_MAX_ENTRIES = 10000
+const EMBEDDING_CACHE_TTL_MS = 24 * 60 * 60 * 1000
+
+// 한 번의 모델 호출로 처리할 청크 수
+const EMBEDDING_BATCH_SIZE = 32
+
+// 모델 최대 토큰 길이(512)를 넘지 않도록 자르는 기준
+const MAX_EMBEDDING_TEXT_LENGTH = 2000
+
+function truncateForEmbedding(text: string): string {
+  return text.length > MAX_EMBEDDING_TEXT_LENGTH
+    ? text.substring(0, MAX_EMBEDDING_TEXT_LENGTH)
+    : text
+}
+
 // 환경 설정: 로컬 모델 허용하지 않음 (HuggingFace Hub에서만)
 env.allowLocalModels = false
 env.allowRemoteModels = true
@@ -8,6 +27,8 @@ class EmbeddingService {
   private embedder: Pipeline | null = null
   private isInitializing = false
   private initPromise: Promise<void> | null = null
+  // 모델명 + 청크 내용 해시 → 임베딩 (Map 삽입 순서를 LRU 순서로 사용)
+  private cache = new Map<string, { embedding: Float32Array; expiresAt: number }>()
 
   async initialize(): Promise<void> {
     if (this.embedder) {
@@ -34,7 +55,7 @@ class EmbeddingService {
     try {
       this.embedder = await pipeline(
         'feature-extraction',
-        'Xenova/all-MiniLM-L6-v2',
+        EMBEDDING_MODEL,
         {
           quantized: true, // 양자화된 모델 사용 (더 빠름, 작은 메모리)
         }
@@ -56,13 +77,21 @@ class EmbeddingService {
     }
 
     try {
+      // 같은 텍스트(반복 질문 등)는 모델 호출 없이 캐시에서 반환
+      const key = this.cacheKey(text)
+      const cached = this.getCachedEmbedding(key)
+      if (cached) {
+        return Array.from(cached)
+      }
+
       // 텍스트가 너무 길면 자르기 (모델 최대 토큰 길이: 512)
-      const truncatedText = text.length > 2000 ? text.substring(0, 2000) : text
+      const truncatedText = truncateForEmbedding(text)
 
       const output = await this.embedder(truncatedText, {
         pooling: 'mean', // 평균 풀링
         normalize: true,  // 정규화 (코사인 유사도용)
       })
+      this.setCachedEmbedding(key, output.data as Float32Array)
 
       // 출력을 숫자 배열로 변환
       const embedding = Array.from(output.data) as number[]
@@ -79,7 +108,43 @@ class EmbeddingService {
     }
   }
 
-  async generateEmbeddings(texts: string[]): Promise<number[][]> {
+  private cacheKey(text: string): string {
+    return createHash('sha256').update(EMBEDDING_MODEL).update('\0').update(text).digest('hex')
+  }
+
+  private getCachedEmbedding(key: string): Float32Array | null {
+    const entry = this.cache.get(key)
+    if (!entry) {
+      return null
+    }
+
+    if (entry.expiresAt <= Date.now()) {
+      this.cache.delete(key)
+      return null
+    }
+
+    // 최근 사용 항목을 맨 뒤로 이동
+    this.cache.delete(key)
+    this.cache.set(key, entry)
+    return entry.embedding
+  }
+
+  private setCachedEmbedding(key: string, embedding: Float32Array): void {
+    this.cache.delete(key)
+    this.cache.set(key, {
+      embedding,
+      expiresAt: Date.now() + EMBEDDING_CACHE_TTL_MS,
+    })
+
+    // 가장 오래 사용하지 않은 항목 제거
+    while (this.cache.size > EMBEDDING_CACHE_MAX_ENTRIES) {
+      const oldestKey = this.cache.keys().next().value as string
+      this.cache.delete(oldestKey)
+    }
+  }
+
+  // 배치 임베딩은 행마다 float32 배열로 반환 (number[] 변환 없이 저장 단계까지 전달)
+  async generateEmbeddings(texts: string[]): Promise<Float32Array[]> {
     if (!this.embedder) {
       await this.initialize()
     }
@@ -89,10 +154,43 @@ class EmbeddingService {
     }
 
     try {
-      // 배치 처리로 여러 텍스트 동시 임베딩
-      const embeddings = await Promise.all(
-        texts.map(text => this.generateEmbedding(text))
-      )
+      const keys = texts.map(text => this.cacheKey(text))
+      const embeddings: Float32Array[] = new Array(texts.length)
+      const missIndices: number[] = []
+
+      // 이미 임베딩한 청크는 캐시에서 재사용
+      keys.forEach((key, index) => {
+        const cached = this.getCachedEmbedding(key)
+        if (cached) {
+          embeddings[index] = cached
+        } else {
+          missIndices.push(index)
+        }
+      })
+
+      if (missIndices.length < texts.length) {
+        console.log(`♻️ 임베딩 캐시 적중: ${texts.length - missIndices.length}/${texts.length}개 청크`)
+      }
+
+      // 캐시에 없는 텍스트만 배치 단위로 한 번의 모델 호출에 임베딩
+      for (let start = 0; start < missIndices.length; start += EMBEDDING_BATCH_SIZE) {
+        const batchIndices = missIndices.slice(start, start + EMBEDDING_BATCH_SIZE)
+        const batchTexts = batchIndices.map(index => truncateForEmbedding(texts[index]))
+
+        const output = await this.embedder(batchTexts, {
+          pooling: 'mean',
+          normalize: true,
+        })
+        // 출력 텐서는 [배치, 차원] 크기의 연속된 Float32Array
+        const data = output.data as Float32Array
+        const dim = output.dims[output.dims.length - 1]
+
+        batchIndices.forEach((index, i) => {
+          const embedding = data.slice(i * dim, (i + 1) * dim)
+          embeddings[index] = embedding
+          this.setCachedEmbedding(keys[index], embedding)
+        })
+      }
 
       return embeddings
     } catch (error) {
@@ -132,7 +230,7 @@ export async function generateEmbedding(text: string): Promise<number[]> {
   return service.generateEmbedding(text)
 }
 
-export async function generateEmbeddings(texts: string[]): Promise<number[][]> {
+export async function generateEmbeddings(texts: string[]): Promise<Float32Array[]> {
   const service = getEmbeddingService()
   return service.generateEmbeddings(texts)
 }
@@ -24,8 +24,11 @@ CREATE INDEX IF NOT EXISTS idx_document_chunks_user_id ON document_chunks(user_i
 CREATE INDEX IF NOT EXISTS idx_document_chunks_created_at ON document_chunks(created_at);
 
 -- Create vector similarity search index (HNSW for cosine similarity)
-CREATE INDEX IF NOT EXISTS idx_document_chunks_embedding
-ON document_chunks USING hnsw (embedding vector_cosine_ops);
+-- Indexed at half precision (halfvec, pgvector 0.7+): half the index size,
+-- while the stored embedding column keeps full float32 precision
+DROP INDEX IF EXISTS idx_document_chunks_embedding;
+CREATE INDEX IF NOT EXISTS idx_document_chunks_embedding_half
+ON document_chunks USING hnsw ((embedding::halfvec(384)) halfvec_cosine_ops);
 
 -- Optional: Create RLS policies if you plan to use authentication
 -- ALTER TABLE document_chunks ENABLE ROW LEVEL SECURITY;
@@ -47,6 +50,8 @@ CREATE TRIGGER update_document_chunks_updated_at
     EXECUTE FUNCTION update_updated_at_column();
 
 -- Optional: Function for vector similarity search
+-- ORDER BY must use the halfvec expression to hit the HNSW index;
+-- the returned similarity is computed from the full-precision vectors
 CREATE OR REPLACE FUNCTION search_document_chunks(
     query_embedding VECTOR(384),
     match_threshold FLOAT DEFAULT 0.8,
@@ -73,6 +78,6 @@ AS $$
         1 - (document_chunks.embedding <=> query_embedding) AS similarity
     FROM document_chunks
     WHERE 1 - (document_chunks.embedding <=> query_embedding) > match_threshold
-    ORDER BY document_chunks.embedding <=> query_embedding
+    ORDER BY document_chunks.embedding::halfvec(384) <=> query_embedding::halfvec(384)
     LIMIT match_count;
 $$;
\ No newline at end of file